@@ -11,33 +11,57 @@ Usage:
 """
 from __future__ import annotations
 
+import ast
+import functools
 import json
 import math
+import re
 import sys
+from dataclasses import dataclass
 from html import escape
+from itertools import chain
 from pathlib import Path
 
 import networkx as nx
-import sympy
 
 
 CONTRADICTION_TOLERANCE = 0.05  # credences should sum to 1.0 +/- this
 
+# Cheap pre-filter for the plain-Python math fast path; _int_comparison then
+# checks the AST so only exact integer comparisons skip SymPy. No '.' or '/':
+# float rounding would disagree with SymPy (0.7*0.9 == 0.63).
+NUMERIC_EXPR = re.compile(r"[\d\s+\-*%()<>=!]+")
+_INT_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Mod)
+# Only orderings: SymPy answers those with sympy.true/false, but turns ==/!=
+# into a plain bool, which check_math does not treat as pass/fail
+_ORDER_OPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
 
 # --- Extraction ---
 
-def extract_statements(data: dict) -> dict[str, dict]:
-    """Extract statement title -> {credence, tag, math, text}."""
+@dataclass(slots=True)
+class Statement:
+    """One argdown statement with the fields the checks and renderer use."""
+    title: str
+    text: str = ""
+    credence: float | None = None
+    tag: str | None = None
+    math: str | None = None
+
+
+def extract_statements(data: dict) -> dict[str, Statement]:
+    """Extract statement title -> Statement(credence, tag, math, text)."""
     statements = {}
     for title, ec in data.get("statements", {}).items():
-        info = {"title": title, "text": "", "credence": None, "tag": None, "math": None}
         d = ec.get("data", {})
-        info["credence"] = d.get("credence")
-        info["tag"] = d.get("tag")
-        info["math"] = d.get("math")
-        if ec.get("members"):
-            info["text"] = ec["members"][0].get("text", "")
-        statements[title] = info
+        members = ec.get("members")
+        statements[title] = Statement(
+            title=title,
+            text=members[0].get("text", "") if members else "",
+            credence=d.get("credence"),
+            tag=d.get("tag"),
+            math=d.get("math"),
+        )
     return statements
 
 
@@ -45,14 +69,9 @@ def extract_relations(data: dict) -> list[dict]:
     """Extract all relations with types (deduplicated)."""
     relations = []
     seen = set()
-    for title, ec in data.get("statements", {}).items():
-        for rel in ec.get("relations", []):
-            key = (rel["from"], rel["to"], rel["relationType"])
-            if key not in seen:
-                seen.add(key)
-                relations.append(rel)
-    for title, arg in data.get("arguments", {}).items():
-        for rel in arg.get("relations", []):
+    owners = chain(data.get("statements", {}).values(), data.get("arguments", {}).values())
+    for owner in owners:
+        for rel in owner.get("relations", []):
             key = (rel["from"], rel["to"], rel["relationType"])
             if key not in seen:
                 seen.add(key)
@@ -60,14 +79,35 @@ def extract_relations(data: dict) -> list[dict]:
     return relations
 
 
+def build_graph(statements: dict, relations: list) -> nx.DiGraph:
+    """Build the relation graph over all statements.
+
+    Edge attr `types` is the set of relation types between the pair, so an
+    entails edge is not lost when the same pair also has another relation.
+    """
+    G = nx.DiGraph()
+    for title in statements:
+        G.add_node(title)
+    for rel in relations:
+        if not G.has_edge(rel["from"], rel["to"]):
+            G.add_edge(rel["from"], rel["to"], types=set())
+        G[rel["from"]][rel["to"]]["types"].add(rel["relationType"])
+    return G
+
+
+def entailment_view(G: nx.DiGraph) -> nx.DiGraph:
+    """Read-only view of G restricted to entails edges."""
+    return nx.subgraph_view(G, filter_edge=lambda u, v: "entails" in G[u][v]["types"])
+
+
 # --- Verification checks ---
 
 def check_credence_consistency(statements: dict, relations: list) -> list[str]:
     """Check credences against strict mode logical constraints."""
     errors = []
+    credences = {t: s.credence for t, s in statements.items() if s.credence is not None}
     for rel in relations:
-        a, b = statements.get(rel["from"], {}), statements.get(rel["to"], {})
-        ca, cb = a.get("credence"), b.get("credence")
+        ca, cb = credences.get(rel["from"]), credences.get(rel["to"])
         if ca is None or cb is None:
             continue
         rtype = rel["relationType"]
@@ -87,42 +127,107 @@ def check_credence_consistency(statements: dict, relations: list) -> list[str]:
     return errors
 
 
+def _sympy():
+    """SymPy, imported on first use: slow to import, and most maps need no symbolic math."""
+    import sympy
+    return sympy
+
+
+@functools.lru_cache(maxsize=4096)
+def _sym(expr_str: str):
+    """Parse a math expression with SymPy, memoized since maps reuse idioms."""
+    return _sympy().sympify(expr_str)
+
+
+def _is_int_arith(node: ast.AST) -> bool:
+    """True if node never leaves exact integer arithmetic.
+
+    Int literals, unary +/-, + - * %, and ** by a non-negative int literal
+    (2**-1 is a float in Python but Rational(1, 2) in SymPy).
+    """
+    if isinstance(node, ast.Constant):
+        return type(node.value) is int
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, (ast.UAdd, ast.USub)) and _is_int_arith(node.operand)
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            exp = node.right
+            return (isinstance(exp, ast.Constant) and type(exp.value) is int
+                    and exp.value >= 0 and _is_int_arith(node.left))
+        return isinstance(node.op, _INT_OPS) and _is_int_arith(node.left) and _is_int_arith(node.right)
+    return False
+
+
+def _int_comparison(expr_str: str) -> bool | None:
+    """Evaluate an ordering of exact integer expressions in plain Python.
+
+    Returns None whenever check_math's verdict could differ from the SymPy
+    path, so the caller falls back to _sym.
+    """
+    if not NUMERIC_EXPR.fullmatch(expr_str):
+        return None
+    try:
+        node = ast.parse(expr_str.strip(), mode="eval").body
+    except SyntaxError:
+        return None
+    if not (isinstance(node, ast.Compare)
+            and all(isinstance(op, _ORDER_OPS) for op in node.ops)
+            and all(_is_int_arith(n) for n in (node.left, *node.comparators))):
+        return None
+    try:
+        return eval(compile(ast.Expression(node), "<math>", "eval"), {"__builtins__": {}}, {})
+    except ArithmeticError:  # e.g. modulo by zero -- let SymPy report it
+        return None
+
+
 def check_math(statements: dict) -> list[str]:
     """Evaluate math expressions with SymPy."""
     errors = []
     for title, s in statements.items():
-        expr_str = s.get("math")
+        expr_str = s.math
         if not expr_str:
             continue
+        fast = _int_comparison(expr_str)
+        if fast is True:
+            continue
+        if fast is False:
+            errors.append(f"MATH FAIL: [{title}]: '{expr_str}' is False")
+            continue
         try:
-            result = sympy.sympify(expr_str)
+            sympy = _sympy()
+            result = _sym(expr_str)
             if result is sympy.true:
                 pass
             elif result is sympy.false:
                 errors.append(f"MATH FAIL: [{title}]: '{expr_str}' is False")
             else:
-                errors.append(f"MATH EVAL: [{title}]: '{expr_str}' = {float(result.evalf()):.4f} (not boolean)")
+                # plain bools from == lack is_Number and still fail on evalf below
+                value = float(result) if getattr(result, "is_Number", False) else float(result.evalf())
+                errors.append(f"MATH EVAL: [{title}]: '{expr_str}' = {value:.4f} (not boolean)")
         except Exception as e:
             errors.append(f"MATH ERROR: [{title}]: '{expr_str}' raised {e}")
     return errors
 
 
-def check_graph(statements: dict, relations: list, data: dict) -> list[str]:
-    """Check for cycles and isolated top-level claims."""
-    G = nx.DiGraph()
-    errors = []
-    for title in statements:
-        G.add_node(title)
-    for rel in relations:
-        G.add_edge(rel["from"], rel["to"], type=rel["relationType"])
+def check_graph(G: nx.DiGraph, E: nx.DiGraph, acyclic: bool, data: dict) -> list[str]:
+    """Check for cycles and isolated top-level claims.
 
-    entailment_edges = [(u, v) for u, v, d in G.edges(data=True) if d["type"] == "entails"]
-    for cycle in nx.simple_cycles(nx.DiGraph(entailment_edges)):
-        errors.append(f"ENTAILMENT CYCLE: {' -> '.join(cycle)}")
+    E is the entailment view of G; acyclic is whether E is a DAG.
+    """
+    errors = []
+    # Well-formed maps are acyclic, so skip the SCC pass entirely. Otherwise
+    # report one representative cycle per strongly connected component: O(V+E),
+    # unlike simple_cycles which enumerates every circuit
+    if not acyclic:
+        for scc in nx.strongly_connected_components(E):
+            node = next(iter(scc))
+            if len(scc) == 1 and not E.has_edge(node, node):
+                continue
+            cycle = [u for u, _ in nx.find_cycle(E.subgraph(scc), node)]
+            errors.append(f"ENTAILMENT CYCLE: {' -> '.join(cycle)}")
 
-    top_level = {t for t, ec in data.get("statements", {}).items() if ec.get("isUsedAsTopLevelStatement")}
-    for title in statements:
-        if G.degree(title) == 0 and title in top_level:
+    for title, ec in data.get("statements", {}).items():
+        if ec.get("isUsedAsTopLevelStatement") and G.degree(title) == 0:
             errors.append(f"ISOLATED: [{title}] is a top-level statement with no relations")
     return errors
 
@@ -134,22 +239,20 @@ def check_pcs_credences(data: dict, statements: dict) -> tuple[list[str], list[s
     Conclusions get {inference: X} (reasoning strength).
     Computed: conclusion_credence = product(premise_credences) * inference.
 
-    Writes computed credences back into statements dict for downstream propagation.
+    Writes computed credences back into statements for downstream propagation.
     """
     errors, notes = [], []
     for arg_name, arg in data.get("arguments", {}).items():
-        pcs = arg.get("pcs", [])
-        premises = [m for m in pcs if m.get("role") == "premise"]
-        conclusions = [m for m in pcs if m.get("role") == "main-conclusion"]
-        if not premises or not conclusions:
-            continue
-
-        premise_credences = [
-            (p["title"], (p.get("data") or {}).get("credence"))
-            for p in premises
-            if (p.get("data") or {}).get("credence") is not None
-        ]
-        if not premise_credences:
+        premise_credences, conclusions = [], []
+        for m in arg.get("pcs", []):
+            role = m.get("role")
+            if role == "premise":
+                c = (m.get("data") or {}).get("credence")
+                if c is not None:
+                    premise_credences.append((m["title"], c))
+            elif role == "main-conclusion":
+                conclusions.append(m)
+        if not premise_credences or not conclusions:
             continue
 
         premise_product = math.prod(c for _, c in premise_credences)
@@ -167,7 +270,7 @@ def check_pcs_credences(data: dict, statements: dict) -> tuple[list[str], list[s
                 notes.append(f"    inference: {inference}")
                 notes.append(f"    computed credence: {premise_product:.3f} * {inference} = {computed:.2f}")
                 if conc["title"] in statements:
-                    statements[conc["title"]]["credence"] = round(computed, 4)
+                    statements[conc["title"]].credence = round(computed, 4)
                 if inference > 1.0:
                     errors.append(f"PCS: <{arg_name}> [{conc['title']}] inference={inference} > 1.0")
             elif hardcoded is not None:
@@ -184,20 +287,32 @@ def check_pcs_credences(data: dict, statements: dict) -> tuple[list[str], list[s
     return errors, notes
 
 
-def crux_analysis(statements: dict, relations: list) -> list[str]:
-    """Identify cruxes: statements whose credence most affects downstream."""
-    G = nx.DiGraph()
-    for rel in relations:
-        if rel["relationType"] == "entails":
-            G.add_edge(rel["from"], rel["to"])
+def crux_analysis(statements: dict, G: nx.DiGraph, acyclic: bool) -> list[str]:
+    """Identify cruxes: statements whose credence most affects downstream.
+
+    G is the entailment graph (see entailment_view); acyclic is whether it is a DAG.
+    """
+    n_desc = None
+    if acyclic:
+        # One bottom-up sweep instead of a BFS per statement; descendant sets
+        # are int bitsets (bit i = node i) so union is | and size is bit_count
+        idx = {n: i for i, n in enumerate(G)}
+        bits = {}
+        for n in reversed(list(nx.topological_sort(G))):
+            b = 0
+            for c in G.successors(n):
+                b |= bits[c] | (1 << idx[c])
+            bits[n] = b
+        n_desc = {n: b.bit_count() for n, b in bits.items()}
+
     notes = []
     for title, s in statements.items():
-        if s.get("credence") is None or title not in G:
+        if s.credence is None or title not in G:
             continue
-        downstream = len(nx.descendants(G, title))
+        downstream = n_desc[title] if n_desc is not None else len(nx.descendants(G, title))
         if downstream > 0:
             notes.append(
-                f"CRUX: [{title}] (credence={s['credence']:.2f}) "
+                f"CRUX: [{title}] (credence={s.credence:.2f}) "
                 f"affects {downstream} downstream statement(s)."
             )
     return notes
@@ -216,7 +331,8 @@ def propagate_credences(statements: dict, relations: list, data: dict) -> dict[s
     """
     targets: dict[str, dict] = {}
     for rel in relations:
-        from_c = statements.get(rel["from"], {}).get("credence")
+        source = statements.get(rel["from"])
+        from_c = source.credence if source else None
         if from_c is None:
             continue
         to = rel["to"]
@@ -268,16 +384,19 @@ def verify(data: dict) -> tuple[int, dict, list]:
     """
     statements = extract_statements(data)
     relations = extract_relations(data)
+    G = build_graph(statements, relations)
+    E = entailment_view(G)
+    acyclic = nx.is_directed_acyclic_graph(E)
 
     all_errors = []
     all_errors += check_credence_consistency(statements, relations)
     all_errors += check_math(statements)
-    all_errors += check_graph(statements, relations, data)
+    all_errors += check_graph(G, E, acyclic, data)
 
     # PCS must run before propagation -- computes conclusion credences
     pcs_errors, pcs_notes = check_pcs_credences(data, statements)
     all_errors += pcs_errors
-    crux_notes = crux_analysis(statements, relations)
+    crux_notes = crux_analysis(statements, E, acyclic)
 
     if all_errors:
         print(f"\n{len(all_errors)} issues found:\n")
@@ -302,7 +421,7 @@ def verify(data: dict) -> tuple[int, dict, list]:
         for line in prop_lines:
             print(line)
 
-    n_credences = sum(1 for s in statements.values() if s.get("credence") is not None)
+    n_credences = sum(1 for s in statements.values() if s.credence is not None)
     print(f"\nSummary: {len(statements)} statements, {len(relations)} relations, {n_credences} with credences")
 
     return (1 if all_errors else 0), statements, relations
@@ -354,25 +473,31 @@ def extract_quote(text: str) -> str | None:
     return None
 
 
-def conclusion_relation(conc_title: str, relations: list[dict]) -> tuple[str, str] | None:
+def first_relations(relations: list[dict]) -> dict[str, tuple[str, str]]:
+    """Map each title to (relationType, to) of its first outgoing relation."""
+    first = {}
     for rel in relations:
-        if rel["from"] == conc_title:
-            return rel["relationType"], rel["to"]
-    return None
+        first.setdefault(rel["from"], (rel["relationType"], rel["to"]))
+    return first
 
 
-def render_argument(arg_name: str, arg: dict, statements: dict, relations: list[dict]) -> str:
+def render_argument(arg_name: str, arg: dict, statements: dict, outgoing: dict[str, tuple[str, str]]) -> str:
     pcs = arg.get("pcs", [])
     if not pcs:
         return ""
 
-    premises = [m for m in pcs if m.get("role") == "premise"]
-    conclusions = [m for m in pcs if m.get("role") == "main-conclusion"]
+    premises, conclusions = [], []
+    for m in pcs:
+        role = m.get("role")
+        if role == "premise":
+            premises.append(m)
+        elif role == "main-conclusion":
+            conclusions.append(m)
 
     # Determine relation type from conclusion
     arg_type, rel_target = None, None
     for conc in conclusions:
-        rel = conclusion_relation(conc.get("title", ""), relations)
+        rel = outgoing.get(conc.get("title", ""))
         if rel:
             arg_type, rel_target = rel
             break
@@ -384,9 +509,12 @@ def render_argument(arg_name: str, arg: dict, statements: dict, relations: list[
     lines.append(f'<h3>{escape(arg_name)}</h3>')
 
     # Premises: quote-first layout with ACE-inspired labels
+    premise_credences = []  # reused for the conclusion math below
     for i, p in enumerate(premises, 1):
         data = p.get("data") or {}
         credence = data.get("credence")
+        if credence is not None:
+            premise_credences.append(credence)
         reason = data.get("reason", "")
         title = p.get("title", "?")
         link_name, link_url = extract_link(p)
@@ -435,18 +563,15 @@ def render_argument(arg_name: str, arg: dict, statements: dict, relations: list[
         data = conc.get("data") or {}
         title = conc.get("title", "?")
         inference = data.get("inference")
-        computed = statements.get(title, {}).get("credence")
+        computed = statements[title].credence if title in statements else None
 
         lines.append('<div class="conclusion">')
         lines.append(f'<span class="label-conclusion">Then</span> ')
         lines.append(f'<strong>{escape(title)}</strong>: {escape(conc.get("text", ""))}')
         # Show explicit math: premise_credences * inference = computed
         if computed is not None:
-            premise_vals = [(p.get("title", "?"), (p.get("data") or {}).get("credence"))
-                           for p in premises if (p.get("data") or {}).get("credence") is not None]
-            if premise_vals and inference is not None:
-                parts_str = " \u00d7 ".join(f"{c:.0%}" for _, c in premise_vals)
-                product = math.prod(c for _, c in premise_vals)
+            if premise_credences and inference is not None:
+                parts_str = " \u00d7 ".join(f"{c:.0%}" for c in premise_credences)
                 lines.append(
                     f'<br><span class="math">{parts_str} \u00d7 {inference:.0%}'
                     f' = {render_credence(computed, "computed credence")}</span>'
@@ -563,13 +688,14 @@ details.source-code pre {{
         section = next((m.get("section") for m in arg.get("members", []) if m.get("section")), None)
         sections.setdefault(section, []).append((arg_name, arg))
     section_titles = {s.get("id", ""): s.get("title", "") for s in data.get("sections", [])}
+    outgoing = first_relations(relations)
 
     for section_id, args in sections.items():
         section_title = section_titles.get(section_id, "")
         if section_title:
             html += f'<h2>{escape(section_title)}</h2>\n'
         for arg_name, arg in args:
-            html += render_argument(arg_name, arg, statements, relations)
+            html += render_argument(arg_name, arg, statements, outgoing)
 
     if argdown_source:
         html += '<details class="source-code">\n<summary>Raw argdown source</summary>\n'